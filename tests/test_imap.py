@@ -0,0 +1,184 @@
+import imaplib
+import socket
+import threading
+import time
+from datetime import datetime, timezone
+from email.message import Message
+
+import pytest
+
+from twscrape import imap as imap_mod
+from twscrape.imap import _check_email_code, _imap_idle, _parse_code, _parse_time
+
+
+def make_msg(frm: str, subj: str):
+    msg = Message()
+    msg["From"] = frm
+    msg["Subject"] = subj
+    return msg
+
+
+def test_parse_code():
+    msg = make_msg("X <info@x.com>", "Your X confirmation code is iuwf4kfo")
+    assert _parse_code(msg) == "iuwf4kfo"
+
+    msg = make_msg("X <Info@X.com>", "Your Twitter confirmation code is 123456")
+    assert _parse_code(msg) == "123456"
+
+    msg = make_msg("spam@example.com", "Your X confirmation code is 123456")
+    assert _parse_code(msg) is None
+
+    msg = make_msg("X <info@x.com>", "New login to your account")
+    assert _parse_code(msg) is None
+
+
+def test_parse_time():
+    exp = datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+    assert _parse_time("Tue, 02 Jan 2024 03:04:05 +0000") == exp
+    assert _parse_time("Tue, 02 Jan 2024 03:04:05 +0000 (UTC)") == exp
+    assert _parse_time("Tue, 02 Jan 2024 03:04:05 GMT") == exp
+    assert _parse_time("Tue, 02 Jan 2024 03:04:05 -0000") == exp
+    assert _parse_time("") is None
+    assert _parse_time("invalid") is None
+
+
+class FakeImap:
+    def __init__(self, msgs: list[tuple[str, str, str]], search_ok=True):
+        self.msgs = msgs  # (from, subject, date)
+        self.search_ok = search_ok
+        self.searches: list[tuple] = []
+        self.fetches: list[str] = []
+
+    def select(self, mailbox: str):
+        return "OK", [str(len(self.msgs)).encode()]
+
+    def search(self, charset, *crit):
+        self.searches.append(crit)
+        if not self.search_ok:
+            return "NO", [b"unsupported"]
+        ids = [i for i, x in enumerate(self.msgs, 1) if "info@x.com" in x[0]]
+        return "OK", [" ".join(map(str, ids)).encode()]
+
+    def fetch(self, msg_set: str, parts: str):
+        self.fetches.append(msg_set)
+        rep = []
+        for i in map(int, msg_set.split(",")):
+            frm, subj, date = self.msgs[i - 1]
+            raw = f"From: {frm}\r\nSubject: {subj}\r\nDate: {date}\r\n\r\n".encode()
+            rep.extend([(f"{i} (BODY[HEADER] {{{len(raw)}}}".encode(), raw), b")"])
+        return "OK", rep
+
+
+def test_check_email_code():
+    date = "Tue, 02 Jan 2024 03:04:05 +0000"
+    msgs = [("X <info@x.com>", "Your X confirmation code is old", date)]
+    msgs += [("spam@example.com", "Hello", date)] * 20
+    msgs += [("X <info@x.com>", "Your X confirmation code is abc123", date)]
+    msgs += [("spam@example.com", "Hello", date)] * 3
+
+    min_t = datetime(2024, 1, 2, tzinfo=timezone.utc)
+    imap = FakeImap(msgs)
+    assert _check_email_code(imap, min_t) == "abc123"  # type: ignore
+    assert imap.searches == [("FROM", '"info@x.com"', "SINCE", "01-Jan-2024")]
+    assert imap.fetches == ["22,1"]  # only matched messages, single round-trip
+
+    # server without SEARCH support – scan inbox from the newest
+    imap = FakeImap(msgs, search_ok=False)
+    assert _check_email_code(imap, None) == "abc123"  # type: ignore
+    assert imap.fetches == ["25,24,23,22,21"]
+
+
+class IdleClient:
+    # minimal part of imaplib.IMAP4 used by _imap_idle
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.file = sock.makefile("rb")
+        self.tagnum = 0
+
+    def _new_tag(self):
+        self.tagnum += 1
+        return f"A{self.tagnum}".encode()
+
+    def send(self, data: bytes):
+        self.sock.sendall(data)
+
+    def readline(self):
+        return self.file.readline()
+
+
+def idle_pair(on_idle: bytes, close=False):
+    cli, srv = socket.socketpair()
+
+    def serve():
+        f = srv.makefile("rb")
+        tag = f.readline().split()[0]
+        srv.sendall(on_idle.replace(b"TAG", tag))
+        if close:
+            srv.shutdown(socket.SHUT_RDWR)
+            return
+
+        if f.readline() == b"DONE\r\n":
+            srv.sendall(tag + b" OK IDLE terminated\r\n")
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    return IdleClient(cli), thread
+
+
+def test_imap_idle_new_mail():
+    # untagged before continuation and EXISTS in same packet as "+"
+    imap, _ = idle_pair(b"* 1 RECENT\r\n+ idling\r\n* 3 EXISTS\r\n")
+    st = time.monotonic()
+    assert _imap_idle(imap, 5) is True  # type: ignore
+    assert time.monotonic() - st < 1
+
+
+def test_imap_idle_rejected():
+    imap, _ = idle_pair(b"TAG BAD unknown command\r\n")
+    assert _imap_idle(imap, 5) is False  # type: ignore
+
+
+def test_imap_idle_timeout():
+    imap, thread = idle_pair(b"+ idling\r\n")
+    st = time.monotonic()
+    assert _imap_idle(imap, 0.3) is True  # type: ignore
+    assert 0.3 <= time.monotonic() - st < 2
+    thread.join(1)
+    assert not thread.is_alive()  # DONE was sent and reply consumed
+
+
+def test_imap_idle_eof():
+    imap, _ = idle_pair(b"+ idling\r\n", close=True)
+    with pytest.raises(imaplib.IMAP4.abort):
+        _imap_idle(imap, 5)  # type: ignore
+
+
+class CodeImap:
+    capabilities: tuple[str, ...] = ()
+
+
+async def test_get_email_code_idle(monkeypatch: pytest.MonkeyPatch):
+    codes, idles = [None, "abc123"], []
+    monkeypatch.setattr(imap_mod, "_check_email_code", lambda imap, min_t: codes.pop(0))
+    monkeypatch.setattr(imap_mod, "_imap_idle", lambda imap, t: idles.append(t) or True)
+
+    imap = CodeImap()
+    imap.capabilities = ("IMAP4REV1", "IDLE")
+    st = time.monotonic()
+    assert await imap_mod.imap_get_email_code(imap, "email") == "abc123"  # type: ignore
+    assert idles == [5]
+    assert time.monotonic() - st < 1  # no fixed sleep when IDLE worked
+
+
+async def test_get_email_code_no_idle(monkeypatch: pytest.MonkeyPatch):
+    codes, sleeps = [None, "abc123"], []
+
+    async def sleep(t):
+        sleeps.append(t)
+
+    monkeypatch.setattr(imap_mod, "_check_email_code", lambda imap, min_t: codes.pop(0))
+    monkeypatch.setattr(imap_mod, "_imap_idle", lambda imap, t: pytest.fail("IDLE not supported"))
+    monkeypatch.setattr(imap_mod.asyncio, "sleep", sleep)
+
+    assert await imap_mod.imap_get_email_code(CodeImap(), "email") == "abc123"  # type: ignore
+    assert sleeps == [5]
@@ -0,0 +1,106 @@
+import asyncio
+import json
+
+import pytest
+from pytest_httpx import HTTPXMock
+
+from twscrape.account import Account
+from twscrape.login import LOGIN_URL, LoginConfig, login
+
+
+def subtasks(*ids: str):
+    return {"flow_token": "token", "subtasks": [{"subtask_id": x} for x in ids]}
+
+
+async def test_login_flow(httpx_mock: HTTPXMock):
+    acc = Account("user1", "pass1", "email1", "email_pass1", "ua", False)
+
+    httpx_mock.add_response(
+        url="https://api.x.com/1.1/guest/activate.json", json={"guest_token": "gt"}
+    )
+    httpx_mock.add_response(
+        url=f"{LOGIN_URL}?flow_name=login", json=subtasks("LoginJsInstrumentationSubtask")
+    )
+    httpx_mock.add_response(url=LOGIN_URL, json=subtasks("LoginEnterUserIdentifierSSO"))
+    httpx_mock.add_response(url=LOGIN_URL, json=subtasks("LoginEnterPassword"))
+    httpx_mock.add_response(url=LOGIN_URL, json=subtasks("AccountDuplicationCheck"))
+    httpx_mock.add_response(
+        url=LOGIN_URL,
+        json=subtasks("LoginSuccessSubtask"),
+        headers={"set-cookie": "ct0=csrf; Domain=.x.com; Path=/"},
+    )
+    httpx_mock.add_response(url=LOGIN_URL, json=subtasks())
+
+    await login(acc)
+    assert acc.active is True
+    assert acc.cookies["ct0"] == "csrf"
+    assert acc.headers["x-csrf-token"] == "csrf"
+    assert acc.headers["x-guest-token"] == "gt"
+
+    reqs = httpx_mock.get_requests(url=LOGIN_URL)
+    inputs = [json.loads(x.content)["subtask_inputs"] for x in reqs]
+    assert [x[0]["subtask_id"] for x in inputs if x] == [
+        "LoginJsInstrumentationSubtask",
+        "LoginEnterUserIdentifierSSO",
+        "LoginEnterPassword",
+        "AccountDuplicationCheck",
+    ]
+    assert inputs[2][0]["enter_password"]["password"] == "pass1"
+    assert inputs[-1] == []
+
+
+async def test_login_timeout(monkeypatch: pytest.MonkeyPatch):
+    async def get_guest_token(*args, **kwargs):
+        await asyncio.sleep(10)
+
+    monkeypatch.setattr("twscrape.login.get_guest_token", get_guest_token)
+
+    acc = Account("user1", "pass1", "email1", "email_pass1", "ua", False)
+    with pytest.raises(asyncio.TimeoutError):
+        await login(acc, cfg=LoginConfig(timeout=0.1))
+
+    assert acc.active is False
+    assert acc.error_msg == "login timeout (0.1 sec)"
+
+
+async def test_login_inner_timeout_error(monkeypatch: pytest.MonkeyPatch):
+    async def get_guest_token(*args, **kwargs):
+        raise TimeoutError("[Errno 110] Connection timed out")
+
+    monkeypatch.setattr("twscrape.login.get_guest_token", get_guest_token)
+
+    acc = Account("user1", "pass1", "email1", "email_pass1", "ua", False)
+    with pytest.raises(TimeoutError, match="Errno 110"):
+        await login(acc, cfg=LoginConfig(timeout=10))
+
+    assert acc.error_msg is None  # not relabelled as overall login timeout
+
+
+async def test_login_mfa_skips_email_first(httpx_mock: HTTPXMock, monkeypatch: pytest.MonkeyPatch):
+    async def imap_login(*args, **kwargs):
+        raise AssertionError("imap should not be used")
+
+    monkeypatch.setattr("twscrape.login.imap_login", imap_login)
+
+    acc = Account(
+        "user1", "pass1", "email1", "email_pass1", "ua", False, mfa_code="JBSWY3DPEHPK3PXP"
+    )
+    httpx_mock.add_response(
+        url="https://api.x.com/1.1/guest/activate.json", json={"guest_token": "gt"}
+    )
+    httpx_mock.add_response(
+        url=f"{LOGIN_URL}?flow_name=login", json=subtasks("LoginTwoFactorAuthChallenge")
+    )
+    httpx_mock.add_response(
+        url=LOGIN_URL,
+        json=subtasks(),
+        headers={"set-cookie": "ct0=csrf; Domain=.x.com; Path=/"},
+    )
+
+    await login(acc, cfg=LoginConfig(email_first=True))
+    assert acc.active is True
+
+    req = httpx_mock.get_requests(url=LOGIN_URL)[-1]
+    inp = json.loads(req.content)["subtask_inputs"][0]
+    assert inp["subtask_id"] == "LoginTwoFactorAuthChallenge"
+    assert len(inp["enter_text"]["text"]) == 6
@@ -1,3 +1,5 @@
+import asyncio
+
 from twscrape.accounts_pool import AccountsPool
 from twscrape.utils import utc
 
@@ -36,6 +38,26 @@ async def test_add_accounts(pool_mock: AccountsPool):
     assert acc.email_password == "email_pass2"
 
 
+async def test_load_from_file(pool_mock: AccountsPool, tmp_path):
+    await pool_mock.add_account("user1", "pass1", "email1", "email_pass1")
+
+    lines = [
+        "user1:pass0:email0:email_pass0:",  # already exists
+        "user2:pass2:email2:email_pass2:",
+        "USER2:pass3:email3:email_pass3:",  # duplicate in file
+        "user3:pass3:email3:email_pass3:ct0=abc; auth_token=def",
+    ]
+    filepath = tmp_path / "accounts.txt"
+    filepath.write_text("\n".join(lines))
+
+    await pool_mock.load_from_file(str(filepath), "username:password:email:email_password:cookies")
+    accs = await pool_mock.get_all()
+    assert [x.username for x in accs] == ["user1", "user2", "user3"]
+    assert [x.password for x in accs] == ["pass1", "pass2", "pass3"]
+    assert [x.active for x in accs] == [False, False, True]
+    assert accs[2].cookies == {"ct0": "abc", "auth_token": "def"}
+
+
 async def test_get_all(pool_mock: AccountsPool):
     # should return empty list
     accs = await pool_mock.get_all()
@@ -67,6 +89,29 @@ async def test_save(pool_mock: AccountsPool):
     assert acc.username == "user1"
 
 
+async def test_save_json_fields(pool_mock: AccountsPool):
+    await pool_mock.add_account("user1", "pass1", "email1", "email_pass1")
+    acc = await pool_mock.get("user1")
+    acc.locks = {"SearchTimeline": utc.from_iso("2024-01-02T03:04:05.123456")}
+    acc.stats = {"SearchTimeline": 10}
+    acc.headers = {"x-csrf-token": "abc"}
+    acc.cookies = {"ct0": "abc", "auth_token": "def"}
+    acc.last_used = utc.from_iso("2024-01-02T03:04:05")
+    await pool_mock.save(acc)
+
+    # should store json as text, so sqlite json functions works with it
+    assert await pool_mock.next_available_at("SearchTimeline") is None
+    await pool_mock.set_active("user1", True)
+    assert await pool_mock.next_available_at("SearchTimeline") == "now"
+
+    acc2 = await pool_mock.get("user1")
+    assert acc2.locks == acc.locks
+    assert acc2.stats == acc.stats
+    assert acc2.headers == acc.headers
+    assert acc2.cookies == acc.cookies
+    assert acc2.last_used == acc.last_used
+
+
 async def test_get_for_queue(pool_mock: AccountsPool):
     Q = "test_queue"
 
@@ -136,3 +181,28 @@ async def test_get_stats(pool_mock: AccountsPool):
     assert stats["total"] == 1
     assert stats["active"] == 1
     assert stats[f"locked_{Q}"] == 1
+
+
+async def test_login_all_concurrency(pool_mock: AccountsPool, monkeypatch):
+    running, max_running = 0, 0
+
+    async def mock_login(acc, cfg=None):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        acc.active = True
+        return acc
+
+    monkeypatch.setattr("twscrape.accounts_pool.login", mock_login)
+    for x in range(1, 6):
+        await pool_mock.add_account(f"user{x}", f"pass{x}", f"email{x}", f"email_pass{x}")
+
+    # should login accounts in parallel, but not more than concurrency limit
+    stats = await pool_mock.login_all(concurrency=2)
+    assert stats == {"total": 5, "success": 5, "failed": 0}
+    assert max_running == 2
+
+    accs = await pool_mock.get_all()
+    assert all(x.active for x in accs)
@@ -1,10 +1,18 @@
+import asyncio
+import gc
+import threading
+import weakref
 from contextlib import aclosing
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
 import httpx
+import pytest
 from pytest_httpx import HTTPXMock
 
+from twscrape import queue_client
+from twscrape.account import Account, get_transport
 from twscrape.accounts_pool import AccountsPool
-from twscrape.queue_client import QueueClient, _format_unknown_error_context
+from twscrape.queue_client import AbortReqError, Ctx, QueueClient, _format_unknown_error_context
 
 DB_FILE = "/tmp/twscrape_test_queue_client.db"
 URL = "https://example.com/api"
@@ -197,3 +205,85 @@ async def test_unknown_error_context_redacts_sensitive_params(client_fixture: CF
     ]
 
     await client.__aexit__(None, None, None)
+
+
+async def test_reuse_transport_of_account(httpx_mock: HTTPXMock, client_fixture: CF):
+    _, client = client_fixture
+
+    # get account and lock it
+    await client.__aenter__()
+    assert client.ctx is not None
+    transport = client.ctx.clt._transport
+
+    # switch account on rate limit, closed client should not close its transport
+    httpx_mock.add_response(
+        url=URL,
+        json={"foo": "1"},
+        headers={"x-rate-limit-remaining": "0", "x-rate-limit-reset": "9999999999"},
+    )
+    httpx_mock.add_response(url=URL, json={"foo": "2"}, status_code=200)
+    rep = await client.get(URL)
+    assert rep is not None
+    assert rep.json() == {"foo": "2"}
+
+    assert client.ctx is not None
+    assert client.ctx.acc.username == "user2"
+    assert client.ctx.clt._transport is not transport  # not shared between accounts
+
+    # closed client of user1 keeps its pool for next use of same account
+    assert get_transport("user1") is transport
+
+    await client.__aexit__(None, None, None)
+
+
+async def test_no_backoff_after_last_retry(httpx_mock: HTTPXMock, monkeypatch: pytest.MonkeyPatch):
+    sleeps = []
+
+    async def sleep(t):
+        sleeps.append(t)
+
+    monkeypatch.setattr(queue_client.asyncio, "sleep", sleep)
+    for _ in range(3):
+        httpx_mock.add_response(url=URL, status_code=404)
+
+    async with httpx.AsyncClient() as clt:
+        ctx = Ctx(Account("user1", "pass1", "email1", "email_pass1", "ua", True), clt)
+        with pytest.raises(AbortReqError):
+            await ctx.req("GET", URL)
+
+    assert len(sleeps) == 2  # between tries only
+
+
+def test_transports_released_with_loop():
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, so pool holds open connection
+
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("content-length", "2")
+            self.end_headers()
+            self.wfile.write(b"ok")
+
+        def log_message(self, format, *args):
+            pass
+
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    loops: list[weakref.ref] = []
+
+    async def main():
+        loops.append(weakref.ref(asyncio.get_running_loop()))
+        acc = Account("user1", "pass1", "email1", "email_pass1", "ua", True)
+        async with acc.make_client() as clt:
+            rep = await clt.get(f"http://127.0.0.1:{srv.server_port}/")
+            assert rep.text == "ok"
+
+    try:
+        for _ in range(3):
+            asyncio.run(main())
+    finally:
+        srv.shutdown()
+        srv.server_close()
+
+    gc.collect()
+    assert [x() for x in loops] == [None, None, None]
@@ -1,5 +1,5 @@
 # ruff: noqa: F401
-from .account import Account
+from .account import Account, close_transports
 from .accounts_pool import AccountsPool, NoAccountError
 from .api import API
 from .logger import set_log_level
@@ -1,16 +1,86 @@
-import json
+import asyncio
 import os
 import sqlite3
-from dataclasses import asdict, dataclass, field
+from dataclasses import dataclass, field
 from datetime import datetime
 
-from httpx import AsyncClient, AsyncHTTPTransport
+import orjson
+from httpx import (
+    AsyncBaseTransport,
+    AsyncClient,
+    AsyncHTTPTransport,
+    Headers,
+    Request,
+    Response,
+)
 
 from .models import JSONTrait
 from .utils import utc
 
 TOKEN = "Bearer AAAAAAAAAAAAAAAAAAAAANRILgAAAAAAnNwIzUejRCOuH5E6I8xnZz4puTs%3D1Zv7ttfk8LF81IUq16cHjhLTvJu4FA33AGWWjCpTnA"
 
+# pre-encoded once, Headers.update() copies encoded items of other Headers as is
+DEFAULT_HEADERS = Headers(
+    {
+        "content-type": "application/json",
+        "authorization": TOKEN,
+        "x-twitter-active-user": "yes",
+        "x-twitter-client-language": "en",
+    }
+)
+
+
+_LOOP_ATTR = "_twscrape_transports"
+
+
+class SharedTransport(AsyncBaseTransport):
+    # connection pool reused by all clients of same account; closing a client must not close it
+    def __init__(self, proxy: str | None = None):
+        self.transport = AsyncHTTPTransport(retries=3, proxy=proxy)
+
+    async def handle_async_request(self, request: Request) -> Response:
+        return await self.transport.handle_async_request(request)
+
+    async def aclose(self):
+        pass
+
+
+def get_transport(username: str, proxy: str | None = None) -> AsyncBaseTransport:
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return AsyncHTTPTransport(retries=3, proxy=proxy)
+
+    # connection pools are bound to event loop, so keep them on loop itself – connections refer
+    # back to loop, so outside cache would keep loop and its sockets alive after loop is done
+    # pools are per account, so each has own connection limits and keep-alive connections
+    items: dict[tuple[str, str | None], SharedTransport] | None = getattr(loop, _LOOP_ATTR, None)
+    if items is None:
+        try:
+            items = {}
+            setattr(loop, _LOOP_ATTR, items)
+        except AttributeError:
+            # loop without __dict__ (eg. uvloop), client owns and closes its transport
+            return AsyncHTTPTransport(retries=3, proxy=proxy)
+
+    key = (username, proxy)
+    if key not in items:
+        items[key] = SharedTransport(proxy)
+    return items[key]
+
+
+def _dumps(obj: dict) -> str:
+    # orjson writes compact json and serializes datetime natively (same as isoformat)
+    return orjson.dumps(obj).decode()
+
+
+async def close_transports():
+    # close pooled connections of current event loop, call on shutdown
+    items: dict = getattr(asyncio.get_running_loop(), _LOOP_ATTR, {})
+    while items:
+        _, x = items.popitem()
+        await x.transport.aclose()
+
 
 @dataclass
 class Account(JSONTrait):
@@ -32,42 +102,60 @@ class Account(JSONTrait):
 
     @staticmethod
     def from_rs(rs: sqlite3.Row):
-        doc = dict(rs)
-        doc["locks"] = {k: utc.from_iso(v) for k, v in json.loads(doc["locks"]).items()}
-        doc["stats"] = {k: v for k, v in json.loads(doc["stats"]).items() if isinstance(v, int)}
-        doc["headers"] = json.loads(doc["headers"])
-        doc["cookies"] = json.loads(doc["cookies"])
-        doc["active"] = bool(doc["active"])
-        doc["last_used"] = utc.from_iso(doc["last_used"]) if doc["last_used"] else None
-        return Account(**doc)
+        return Account(
+            username=rs["username"],
+            password=rs["password"],
+            email=rs["email"],
+            email_password=rs["email_password"],
+            user_agent=rs["user_agent"],
+            active=bool(rs["active"]),
+            locks={k: utc.from_iso(v) for k, v in orjson.loads(rs["locks"]).items()},
+            stats={k: v for k, v in orjson.loads(rs["stats"]).items() if isinstance(v, int)},
+            headers=orjson.loads(rs["headers"]),
+            cookies=orjson.loads(rs["cookies"]),
+            mfa_code=rs["mfa_code"],
+            proxy=rs["proxy"],
+            error_msg=rs["error_msg"],
+            last_used=utc.from_iso(rs["last_used"]) if rs["last_used"] else None,
+            _tx=rs["_tx"],
+        )
 
     def to_rs(self):
-        rs = asdict(self)
-        rs["locks"] = json.dumps(rs["locks"], default=lambda x: x.isoformat())
-        rs["stats"] = json.dumps(rs["stats"])
-        rs["headers"] = json.dumps(rs["headers"])
-        rs["cookies"] = json.dumps(rs["cookies"])
-        rs["last_used"] = rs["last_used"].isoformat() if rs["last_used"] else None
-        return rs
+        # direct field access instead of asdict, which deep-copies every dict field
+        return {
+            "username": self.username,
+            "password": self.password,
+            "email": self.email,
+            "email_password": self.email_password,
+            "user_agent": self.user_agent,
+            "active": self.active,
+            "locks": _dumps(self.locks),
+            "stats": _dumps(self.stats),
+            "headers": _dumps(self.headers),
+            "cookies": _dumps(self.cookies),
+            "mfa_code": self.mfa_code,
+            "proxy": self.proxy,
+            "error_msg": self.error_msg,
+            "last_used": self.last_used.isoformat() if self.last_used else None,
+            "_tx": self._tx,
+        }
+
+    def get_proxy(self) -> str | None:
+        return os.getenv("TWS_PROXY", self.proxy)
 
     def make_client(self, proxy: str | None = None) -> AsyncClient:
-        proxies = [proxy, os.getenv("TWS_PROXY"), self.proxy]
-        proxies = [x for x in proxies if x is not None]
-        proxy = proxies[0] if proxies else None
+        proxy = proxy if proxy is not None else self.get_proxy()
 
-        transport = AsyncHTTPTransport(retries=3)
-        client = AsyncClient(proxy=proxy, follow_redirects=True, transport=transport)
+        transport = get_transport(self.username, proxy)
+        client = AsyncClient(follow_redirects=True, transport=transport)
 
         # saved from previous usage
         client.cookies.update(self.cookies)
         client.headers.update(self.headers)
 
         # default settings
+        client.headers.update(DEFAULT_HEADERS)
         client.headers["user-agent"] = self.user_agent
-        client.headers["content-type"] = "application/json"
-        client.headers["authorization"] = TOKEN
-        client.headers["x-twitter-active-user"] = "yes"
-        client.headers["x-twitter-client-language"] = "en"
 
         if "ct0" in client.cookies:
             client.headers["x-csrf-token"] = client.cookies["ct0"]
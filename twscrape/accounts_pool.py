@@ -4,14 +4,13 @@ import uuid
 from datetime import datetime, timezone
 from typing import TypedDict
 
-from fake_useragent import UserAgent
 from httpx import HTTPStatusError
 
 from .account import Account
-from .db import execute, fetchall, fetchone
+from .db import execute, executemany, fetchall, fetchone
 from .logger import logger
 from .login import LoginConfig, login
-from .utils import get_env_bool, parse_cookies, utc
+from .utils import fake_ua, get_env_bool, parse_cookies, utc
 
 
 class NoAccountError(Exception):
@@ -27,6 +26,44 @@ class AccountInfo(TypedDict):
     error_msg: str | None
 
 
+def new_account(
+    username: str,
+    password: str,
+    email: str,
+    email_password: str,
+    user_agent: str | None = None,
+    proxy: str | None = None,
+    cookies: str | None = None,
+    mfa_code: str | None = None,
+):
+    account = Account(
+        username=username,
+        password=password,
+        email=email,
+        email_password=email_password,
+        user_agent=user_agent or fake_ua().safari,
+        active=False,
+        locks={},
+        stats={},
+        headers={},
+        cookies=parse_cookies(cookies) if cookies else {},
+        proxy=proxy,
+        mfa_code=mfa_code,
+    )
+
+    if "ct0" in account.cookies:
+        account.active = True
+
+    return account
+
+
+def upsert_query(cols: list[str]):
+    return f"""
+    INSERT INTO accounts ({",".join(cols)}) VALUES ({",".join([f":{x}" for x in cols])})
+    ON CONFLICT(username) DO UPDATE SET {",".join([f"{x}=excluded.{x}" for x in cols])}
+    """
+
+
 def guess_delim(line: str):
     lp, rp = tuple([x.strip() for x in line.split("username")])
     return rp[0] if not lp else lp[-1]
@@ -68,8 +105,7 @@ class AccountsPool:
                 vals = {k: v for k, v in zip(tokens, data) if k != "_"}
                 accounts.append(vals)
 
-        for x in accounts:
-            await self.add_account(**x)
+        await self.add_accounts(accounts)
 
     async def add_account(
         self,
@@ -88,27 +124,30 @@ class AccountsPool:
             logger.warning(f"Account {username} already exists")
             return
 
-        account = Account(
-            username=username,
-            password=password,
-            email=email,
-            email_password=email_password,
-            user_agent=user_agent or UserAgent().safari,
-            active=False,
-            locks={},
-            stats={},
-            headers={},
-            cookies=parse_cookies(cookies) if cookies else {},
-            proxy=proxy,
-            mfa_code=mfa_code,
+        account = new_account(
+            username, password, email, email_password, user_agent, proxy, cookies, mfa_code
         )
-
-        if "ct0" in account.cookies:
-            account.active = True
-
         await self.save(account)
         logger.info(f"Account {username} added successfully (active={account.active})")
 
+    async def add_accounts(self, items: list[dict[str, str]]):
+        # same as add_account, but with one query to check existing and one to insert all
+        rs = await fetchall(self._db_file, "SELECT username FROM accounts")
+        exists = {x["username"].lower() for x in rs}
+
+        accounts: list[Account] = []
+        for x in items:
+            if x["username"].lower() in exists:
+                logger.warning(f"Account {x['username']} already exists")
+                continue
+
+            exists.add(x["username"].lower())
+            accounts.append(new_account(**x))
+
+        await self.save_many(accounts)
+        for x in accounts:
+            logger.info(f"Account {x.username} added successfully (active={x.active})")
+
     async def delete_accounts(self, usernames: str | list[str]):
         usernames = usernames if isinstance(usernames, list) else [usernames]
         usernames = list(set(usernames))
@@ -144,13 +183,15 @@ class AccountsPool:
 
     async def save(self, account: Account):
         data = account.to_rs()
-        cols = list(data.keys())
+        await execute(self._db_file, upsert_query(list(data.keys())), data)
 
-        qs = f"""
-        INSERT INTO accounts ({",".join(cols)}) VALUES ({",".join([f":{x}" for x in cols])})
-        ON CONFLICT(username) DO UPDATE SET {",".join([f"{x}=excluded.{x}" for x in cols])}
-        """
-        await execute(self._db_file, qs, data)
+    async def save_many(self, accounts: list[Account]):
+        # single connection and transaction for all rows
+        if not accounts:
+            return
+
+        data = [x.to_rs() for x in accounts]
+        await executemany(self._db_file, upsert_query(list(data[0].keys())), data)
 
     async def login(self, account: Account):
         try:
@@ -167,7 +208,7 @@ class AccountsPool:
         finally:
             await self.save(account)
 
-    async def login_all(self, usernames: list[str] | None = None):
+    async def login_all(self, usernames: list[str] | None = None, concurrency=1):
         if usernames is None:
             qs = "SELECT * FROM accounts WHERE active = false AND error_msg IS NULL"
         else:
@@ -176,16 +217,23 @@ class AccountsPool:
 
         rs = await fetchall(self._db_file, qs)
         accounts = [Account.from_rs(rs) for rs in rs]
-        # await asyncio.gather(*[login(x) for x in self.accounts])
+
+        # manual mode reads email code from stdin, so only one login at a time
+        concurrency = 1 if self._login_config.manual else max(1, concurrency)
+        semaphore = asyncio.Semaphore(concurrency)
 
         counter = {"total": len(accounts), "success": 0, "failed": 0}
-        for i, x in enumerate(accounts, start=1):
-            logger.info(f"[{i}/{len(accounts)}] Logging in {x.username} - {x.email}")
-            status = await self.login(x)
-            counter["success" if status else "failed"] += 1
+
+        async def _login(i: int, x: Account):
+            async with semaphore:
+                logger.info(f"[{i}/{len(accounts)}] Logging in {x.username} - {x.email}")
+                status = await self.login(x)
+                counter["success" if status else "failed"] += 1
+
+        await asyncio.gather(*[_login(i, x) for i, x in enumerate(accounts, start=1)])
         return counter
 
-    async def relogin(self, usernames: str | list[str]):
+    async def relogin(self, usernames: str | list[str], concurrency=1):
         usernames = usernames if isinstance(usernames, list) else [usernames]
         usernames = list(set(usernames))
         if not usernames:
@@ -200,17 +248,17 @@ class AccountsPool:
             error_msg = NULL,
             headers = json_object(),
             cookies = json_object(),
-            user_agent = "{UserAgent().safari}"
+            user_agent = "{fake_ua().safari}"
         WHERE username IN ({",".join([f'"{x}"' for x in usernames])})
         """
 
         await execute(self._db_file, qs)
-        await self.login_all(usernames)
+        await self.login_all(usernames, concurrency=concurrency)
 
-    async def relogin_failed(self):
+    async def relogin_failed(self, concurrency=1):
         qs = "SELECT username FROM accounts WHERE active = false AND error_msg IS NOT NULL"
         rs = await fetchall(self._db_file, qs)
-        await self.relogin([x["username"] for x in rs])
+        await self.relogin([x["username"] for x in rs], concurrency=concurrency)
 
     async def reset_locks(self):
         qs = "UPDATE accounts SET locks = json_object()"
@@ -9,6 +9,7 @@ from importlib.metadata import version
 
 import httpx
 
+from .account import close_transports
 from .api import API, AccountsPool
 from .db import get_sqlite_version
 from .logger import logger, set_log_level
@@ -41,6 +42,13 @@ def to_str(doc: httpx.Response | Tweet | User | None) -> str:
 
 
 async def main(args):
+    try:
+        await _main(args)
+    finally:
+        await close_transports()
+
+
+async def _main(args):
     if args.debug:
         set_log_level("DEBUG")
 
@@ -82,16 +90,16 @@ async def main(args):
         return
 
     if args.command == "login_accounts":
-        stats = await pool.login_all()
+        stats = await pool.login_all(concurrency=args.concurrency)
         print(stats)
         return
 
     if args.command == "relogin_failed":
-        await pool.relogin_failed()
+        await pool.relogin_failed(concurrency=args.concurrency)
         return
 
     if args.command == "relogin":
-        await pool.relogin(args.usernames)
+        await pool.relogin(args.usernames, concurrency=args.concurrency)
         return
 
     if args.command == "reset_locks":
@@ -176,6 +184,7 @@ def run():
     for cmd in login_commands:
         cmd.add_argument("--email-first", action="store_true", help="Check email first")
         cmd.add_argument("--manual", action="store_true", help="Enter email code manually")
+        cmd.add_argument("--concurrency", type=int, default=1, help="Accounts to login at once")
 
     subparsers.add_parser("reset_locks", help="Reset all locks")
     subparsers.add_parser("delete_inactive", help="Delete inactive accounts")
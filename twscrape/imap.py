@@ -1,9 +1,15 @@
 import asyncio
-import email as emaillib
 import imaplib
+import io
 import os
+import re
+import select
+import ssl
 import time
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+from email.message import Message
+from email.parser import BytesHeaderParser
+from email.utils import parsedate_to_datetime
 
 from .logger import logger
 
@@ -16,6 +22,11 @@ def env_int(key: str | list[str], default: int) -> int:
 
 
 TWS_WAIT_EMAIL_CODE = env_int(["TWS_WAIT_EMAIL_CODE", "LOGIN_CODE_TIMEOUT"], 30)
+IMAP_FETCH_BATCH = 5
+
+_HEADER_PARSER = BytesHeaderParser()
+_CODE_RE = re.compile(r"confirmation code is (\S+)", re.IGNORECASE)
+_MONTHS = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
 
 
 class EmailLoginError(Exception):
@@ -49,31 +60,151 @@ def _get_imap_domain(email: str) -> str:
     return f"imap.{email_domain}"
 
 
-def _wait_email_code(imap: imaplib.IMAP4_SSL, count: int, min_t: datetime | None) -> str | None:
-    for i in range(count, 0, -1):
-        _, rep = imap.fetch(str(i), "(RFC822)")
-        for x in rep:
-            if isinstance(x, tuple):
-                msg = emaillib.message_from_bytes(x[1])
+def _parse_time(val: str) -> datetime | None:
+    # https://www.ietf.org/rfc/rfc9051.html#section-6.3.12-13
+    try:
+        msg_time = parsedate_to_datetime(val)
+    except (TypeError, ValueError):
+        return None
+
+    # "-0000" means unknown timezone, treat as UTC
+    return msg_time if msg_time.tzinfo else msg_time.replace(tzinfo=timezone.utc)
+
+
+def _search_ids(imap: imaplib.IMAP4_SSL, min_t: datetime | None) -> list[int] | None:
+    # let server filter inbox, so only candidate messages are fetched
+    crit = ["FROM", '"info@x.com"']
+    if min_t is not None:
+        # SINCE is date only (in server timezone), exact time is checked by Date header later
+        d = min_t - timedelta(days=1)
+        crit += ["SINCE", f"{d.day:02d}-{_MONTHS[d.month - 1]}-{d.year}"]
+
+    try:
+        typ, rep = imap.search(None, *crit)
+    except imaplib.IMAP4.error:
+        return None  # fallback to scan whole inbox
+
+    if typ != "OK":
+        return None
+
+    return [int(x) for x in rep[0].split()] if rep and rep[0] else []
+
+
+def _fetch_messages(imap: imaplib.IMAP4_SSL, ids: list[int]) -> list[tuple[int, Message]]:
+    # one FETCH for whole batch instead of round-trip per message, newest first
+    # only headers needed to find the code, PEEK also keeps messages unread
+    msg_set = ",".join(str(x) for x in ids)
+    _, rep = imap.fetch(msg_set, "(BODY.PEEK[HEADER.FIELDS (DATE FROM SUBJECT)])")
+    msgs = []
+    for x in rep:
+        if isinstance(x, tuple):
+            msgs.append((int(x[0].split()[0]), _HEADER_PARSER.parsebytes(x[1])))
+    return sorted(msgs, key=lambda x: x[0], reverse=True)
 
-                # https://www.ietf.org/rfc/rfc9051.html#section-6.3.12-13
-                msg_time = msg.get("Date", "").split("(")[0].strip()
-                msg_time = datetime.strptime(msg_time, "%a, %d %b %Y %H:%M:%S %z")
 
-                msg_from = str(msg.get("From", "")).lower()
-                msg_subj = str(msg.get("Subject", "")).lower()
-                logger.info(f"({i} of {count}) {msg_from} - {msg_time} - {msg_subj}")
+def _parse_code(msg: Message) -> str | None:
+    if "info@x.com" not in str(msg.get("From", "")).lower():
+        return None
 
-                if min_t is not None and msg_time < min_t:
+    # eg. Your Twitter confirmation code is XXX
+    m = _CODE_RE.search(str(msg.get("Subject", "")))
+    return m.group(1).strip().lower() if m else None
+
+
+def _wait_email_code(
+    imap: imaplib.IMAP4_SSL, ids: list[int], min_t: datetime | None
+) -> str | None:
+    ids, count = sorted(ids, reverse=True), len(ids)
+    for n in range(0, count, IMAP_FETCH_BATCH):
+        msgs = _fetch_messages(imap, ids[n : n + IMAP_FETCH_BATCH])
+        for pos, (_, msg) in enumerate(msgs, start=n + 1):
+            msg_date = msg.get("Date", "")
+            logger.info(
+                f"({pos} of {count}) {msg.get('From')} - {msg_date} - {msg.get('Subject')}"
+            )
+
+            if min_t is not None:
+                msg_time = _parse_time(msg_date)
+                if msg_time is not None and msg_time < min_t:
                     return None
 
-                if "info@x.com" in msg_from and "confirmation code is" in msg_subj:
-                    # eg. Your Twitter confirmation code is XXX
-                    return msg_subj.split(" ")[-1].strip()
+            if code := _parse_code(msg):
+                return code
 
     return None
 
 
+def _check_email_code(imap: imaplib.IMAP4_SSL, min_t: datetime | None) -> str | None:
+    _, rep = imap.select("INBOX")
+    msg_count = int(rep[0].decode("utf-8")) if len(rep) > 0 and rep[0] is not None else 0
+    ids = _search_ids(imap, min_t)
+    ids = ids if ids is not None else list(range(1, msg_count + 1))
+    return _wait_email_code(imap, ids, min_t)
+
+
+IMAP_IDLE_REPLY_TIMEOUT = 10  # sec to wait for server reply to IDLE / DONE
+
+
+def _imap_buffered(imap: imaplib.IMAP4_SSL) -> bool:
+    # select sees only the socket, not data already read into ssl / imaplib buffers
+    if getattr(imap.sock, "pending", lambda: 0)() > 0:
+        return True
+
+    if not isinstance(imap.file, io.BufferedReader):
+        return False
+
+    prev = imap.sock.gettimeout()
+    imap.sock.setblocking(False)
+    try:
+        return len(imap.file.peek(1)) > 0
+    except (BlockingIOError, ssl.SSLWantReadError):
+        return False
+    finally:
+        imap.sock.settimeout(prev)
+
+
+def _imap_readline(imap: imaplib.IMAP4_SSL, deadline: float) -> bytes | None:
+    if not _imap_buffered(imap):
+        left = deadline - time.monotonic()
+        if left <= 0 or not select.select([imap.sock], [], [], left)[0]:
+            return None  # timeout
+
+    # imaplib returns b"" on EOF instead of raising
+    line = imap.readline()
+    if not line:
+        raise imaplib.IMAP4.abort("connection closed during IDLE")
+    return line
+
+
+def _imap_idle(imap: imaplib.IMAP4_SSL, timeout: float) -> bool:
+    # https://www.rfc-editor.org/rfc/rfc2177 – server pushes "* N EXISTS" on new message,
+    # so code can be read as soon as it arrives instead of on next poll
+    tag = imap._new_tag()
+    imap.send(tag + b" IDLE\r\n")
+
+    # untagged updates are allowed before continuation
+    has_new, reply_t = False, time.monotonic() + IMAP_IDLE_REPLY_TIMEOUT
+    while (line := _imap_readline(imap, reply_t)) is not None and line.startswith(b"*"):
+        has_new = has_new or b"EXISTS" in line
+
+    if line is None:
+        raise imaplib.IMAP4.abort("no reply to IDLE")
+    if not line.startswith(b"+"):
+        return False  # rejected by server, tagged response already consumed
+
+    deadline = time.monotonic() + timeout
+    while not has_new and (line := _imap_readline(imap, deadline)) is not None:
+        has_new = b"EXISTS" in line
+
+    imap.send(b"DONE\r\n")
+    reply_t = time.monotonic() + IMAP_IDLE_REPLY_TIMEOUT
+    while (line := _imap_readline(imap, reply_t)) is not None:
+        if line.startswith(tag):
+            return True
+
+    raise imaplib.IMAP4.abort("no reply to IDLE DONE")
+
+
 async def imap_get_email_code(
     imap: imaplib.IMAP4_SSL, email: str, min_t: datetime | None = None
 ) -> str:
@@ -81,23 +212,36 @@ async def imap_get_email_code(
         logger.info(f"Waiting for confirmation code for {email}...")
         start_time = time.time()
         while True:
-            _, rep = imap.select("INBOX")
-            msg_count = int(rep[0].decode("utf-8")) if len(rep) > 0 and rep[0] is not None else 0
-            code = _wait_email_code(imap, msg_count, min_t)
+            # imaplib is blocking, so run it in thread to not block event loop while waiting
+            code = await asyncio.to_thread(_check_email_code, imap, min_t)
             if code is not None:
                 return code
 
             if TWS_WAIT_EMAIL_CODE < time.time() - start_time:
                 raise EmailCodeTimeoutError(f"Email code timeout ({TWS_WAIT_EMAIL_CODE} sec)")
 
-            await asyncio.sleep(5)
+            idle = "IDLE" in imap.capabilities
+            if not idle or not await asyncio.to_thread(_imap_idle, imap, 5):
+                await asyncio.sleep(5)
     except Exception as e:
         imap.select("INBOX")
         imap.close()
         raise e
 
 
-async def imap_login(email: str, password: str):
+def _imap_alive(imap: imaplib.IMAP4_SSL) -> bool:
+    try:
+        imap.noop()
+        return True
+    except (imaplib.IMAP4.error, OSError):
+        return False
+
+
+async def imap_alive(imap: imaplib.IMAP4_SSL) -> bool:
+    return await asyncio.to_thread(_imap_alive, imap)
+
+
+def _imap_login(email: str, password: str):
     domain = _get_imap_domain(email)
     imap = imaplib.IMAP4_SSL(domain)
 
@@ -109,3 +253,7 @@ async def imap_login(email: str, password: str):
         raise EmailLoginError() from e
 
     return imap
+
+
+async def imap_login(email: str, password: str):
+    return await asyncio.to_thread(_imap_login, email, password)
@@ -17,15 +17,17 @@ def _load_from_env() -> _TLOGLEVEL:
 
 
 _LOG_LEVEL: _TLOGLEVEL = _load_from_env()
+_LOG_LEVEL_NO: int = logger.level(_LOG_LEVEL).no  # resolved once, not on every record
 
 
 def set_log_level(level: _TLOGLEVEL):
-    global _LOG_LEVEL
+    global _LOG_LEVEL, _LOG_LEVEL_NO
     _LOG_LEVEL = level
+    _LOG_LEVEL_NO = logger.level(level).no
 
 
 def _filter(r):
-    return r["level"].no >= logger.level(_LOG_LEVEL).no
+    return r["level"].no >= _LOG_LEVEL_NO
 
 
 logger.remove()
@@ -1,4 +1,6 @@
+import asyncio
 import imaplib
+import time
 from dataclasses import dataclass
 from datetime import timedelta
 from typing import Any
@@ -7,17 +9,20 @@ import pyotp
 from httpx import AsyncClient, Response
 
 from .account import Account
-from .imap import imap_get_email_code, imap_login
+from .imap import TWS_WAIT_EMAIL_CODE, env_int, imap_alive, imap_get_email_code, imap_login
 from .logger import logger
 from .utils import utc
 
 LOGIN_URL = "https://api.x.com/1.1/onboarding/task.json"
+# default leaves room for email code wait plus other login steps
+TWS_LOGIN_TIMEOUT = env_int("TWS_LOGIN_TIMEOUT", TWS_WAIT_EMAIL_CODE + 90)
 
 
 @dataclass
 class LoginConfig:
     email_first: bool = False
     manual: bool = False
+    timeout: float | None = TWS_LOGIN_TIMEOUT  # sec per login attempt, None / 0 to disable
 
 
 @dataclass
@@ -48,76 +53,57 @@ async def login_initiate(client: AsyncClient) -> Response:
     return rep
 
 
-async def login_alternate_identifier(ctx: TaskCtx, *, username: str) -> Response:
-    payload = {
-        "flow_token": ctx.prev["flow_token"],
-        "subtask_inputs": [
-            {
-                "subtask_id": "LoginEnterAlternateIdentifierSubtask",
-                "enter_text": {"text": username, "link": "next_link"},
-            }
-        ],
-    }
-
+async def login_subtask(ctx: TaskCtx, *subtask_inputs: dict) -> Response:
+    payload = {"flow_token": ctx.prev["flow_token"], "subtask_inputs": list(subtask_inputs)}
     rep = await ctx.client.post(LOGIN_URL, json=payload)
     rep.raise_for_status()
     return rep
 
 
-async def login_instrumentation(ctx: TaskCtx) -> Response:
-    payload = {
-        "flow_token": ctx.prev["flow_token"],
-        "subtask_inputs": [
-            {
-                "subtask_id": "LoginJsInstrumentationSubtask",
-                "js_instrumentation": {"response": "{}", "link": "next_link"},
-            }
-        ],
-    }
+def enter_text(subtask_id: str, text: str) -> dict:
+    return {"subtask_id": subtask_id, "enter_text": {"text": text, "link": "next_link"}}
 
-    rep = await ctx.client.post(LOGIN_URL, json=payload)
-    rep.raise_for_status()
-    return rep
 
+async def login_alternate_identifier(ctx: TaskCtx, *, username: str) -> Response:
+    return await login_subtask(ctx, enter_text("LoginEnterAlternateIdentifierSubtask", username))
 
-async def login_enter_username(ctx: TaskCtx) -> Response:
-    payload = {
-        "flow_token": ctx.prev["flow_token"],
-        "subtask_inputs": [
-            {
-                "subtask_id": "LoginEnterUserIdentifierSSO",
-                "settings_list": {
-                    "setting_responses": [
-                        {
-                            "key": "user_identifier",
-                            "response_data": {"text_data": {"result": ctx.acc.username}},
-                        }
-                    ],
-                    "link": "next_link",
-                },
-            }
-        ],
-    }
 
-    rep = await ctx.client.post(LOGIN_URL, json=payload)
-    rep.raise_for_status()
-    return rep
+async def login_instrumentation(ctx: TaskCtx) -> Response:
+    return await login_subtask(
+        ctx,
+        {
+            "subtask_id": "LoginJsInstrumentationSubtask",
+            "js_instrumentation": {"response": "{}", "link": "next_link"},
+        },
+    )
 
 
-async def login_enter_password(ctx: TaskCtx) -> Response:
-    payload = {
-        "flow_token": ctx.prev["flow_token"],
-        "subtask_inputs": [
-            {
-                "subtask_id": "LoginEnterPassword",
-                "enter_password": {"password": ctx.acc.password, "link": "next_link"},
-            }
-        ],
-    }
+async def login_enter_username(ctx: TaskCtx) -> Response:
+    return await login_subtask(
+        ctx,
+        {
+            "subtask_id": "LoginEnterUserIdentifierSSO",
+            "settings_list": {
+                "setting_responses": [
+                    {
+                        "key": "user_identifier",
+                        "response_data": {"text_data": {"result": ctx.acc.username}},
+                    }
+                ],
+                "link": "next_link",
+            },
+        },
+    )
 
-    rep = await ctx.client.post(LOGIN_URL, json=payload)
-    rep.raise_for_status()
-    return rep
+
+async def login_enter_password(ctx: TaskCtx) -> Response:
+    return await login_subtask(
+        ctx,
+        {
+            "subtask_id": "LoginEnterPassword",
+            "enter_password": {"password": ctx.acc.password, "link": "next_link"},
+        },
+    )
 
 
 async def login_two_factor_auth_challenge(ctx: TaskCtx) -> Response:
@@ -125,51 +111,21 @@ async def login_two_factor_auth_challenge(ctx: TaskCtx) -> Response:
         raise ValueError("MFA code is required")
 
     totp = pyotp.TOTP(ctx.acc.mfa_code)
-    payload = {
-        "flow_token": ctx.prev["flow_token"],
-        "subtask_inputs": [
-            {
-                "subtask_id": "LoginTwoFactorAuthChallenge",
-                "enter_text": {"text": totp.now(), "link": "next_link"},
-            }
-        ],
-    }
-
-    rep = await ctx.client.post(LOGIN_URL, json=payload)
-    rep.raise_for_status()
-    return rep
+    return await login_subtask(ctx, enter_text("LoginTwoFactorAuthChallenge", totp.now()))
 
 
 async def login_duplication_check(ctx: TaskCtx) -> Response:
-    payload = {
-        "flow_token": ctx.prev["flow_token"],
-        "subtask_inputs": [
-            {
-                "subtask_id": "AccountDuplicationCheck",
-                "check_logged_in_account": {"link": "AccountDuplicationCheck_false"},
-            }
-        ],
-    }
-
-    rep = await ctx.client.post(LOGIN_URL, json=payload)
-    rep.raise_for_status()
-    return rep
+    return await login_subtask(
+        ctx,
+        {
+            "subtask_id": "AccountDuplicationCheck",
+            "check_logged_in_account": {"link": "AccountDuplicationCheck_false"},
+        },
+    )
 
 
 async def login_confirm_email(ctx: TaskCtx) -> Response:
-    payload = {
-        "flow_token": ctx.prev["flow_token"],
-        "subtask_inputs": [
-            {
-                "subtask_id": "LoginAcid",
-                "enter_text": {"text": ctx.acc.email, "link": "next_link"},
-            }
-        ],
-    }
-
-    rep = await ctx.client.post(LOGIN_URL, json=payload)
-    rep.raise_for_status()
-    return rep
+    return await login_subtask(ctx, enter_text("LoginAcid", ctx.acc.email))
 
 
 async def login_confirm_email_code(ctx: TaskCtx):
@@ -178,36 +134,18 @@ async def login_confirm_email_code(ctx: TaskCtx):
         value = input("Code: ")
         value = value.strip()
     else:
-        if not ctx.imap:
+        # reuse connection opened before (eg. --email-first), reconnect only if it was dropped
+        if not ctx.imap or not await imap_alive(ctx.imap):
             ctx.imap = await imap_login(ctx.acc.email, ctx.acc.email_password)
 
         now_time = utc.now() - timedelta(seconds=30)
         value = await imap_get_email_code(ctx.imap, ctx.acc.email, now_time)
 
-    payload = {
-        "flow_token": ctx.prev["flow_token"],
-        "subtask_inputs": [
-            {
-                "subtask_id": "LoginAcid",
-                "enter_text": {"text": value, "link": "next_link"},
-            }
-        ],
-    }
-
-    rep = await ctx.client.post(LOGIN_URL, json=payload)
-    rep.raise_for_status()
-    return rep
+    return await login_subtask(ctx, enter_text("LoginAcid", value))
 
 
 async def login_success(ctx: TaskCtx) -> Response:
-    payload = {
-        "flow_token": ctx.prev["flow_token"],
-        "subtask_inputs": [],
-    }
-
-    rep = await ctx.client.post(LOGIN_URL, json=payload)
-    rep.raise_for_status()
-    return rep
+    return await login_subtask(ctx)
 
 
 async def next_login_task(ctx: TaskCtx, rep: Response):
@@ -254,8 +192,29 @@ async def login(acc: Account, cfg: LoginConfig | None = None) -> Account:
         logger.info(f"account already active {log_id}")
         return acc
 
-    cfg, imap = cfg or LoginConfig(), None
-    if cfg.email_first and not cfg.manual:
+    cfg = cfg or LoginConfig()
+    # manual mode waits for user input, so no deadline there
+    if not cfg.timeout or cfg.manual:
+        return await _login(acc, cfg)
+
+    # hard limit for whole flow, so one stuck account not blocks others
+    deadline = time.monotonic() + cfg.timeout
+    try:
+        return await asyncio.wait_for(_login(acc, cfg), timeout=cfg.timeout)
+    except asyncio.TimeoutError:
+        # since py3.11 it's builtin TimeoutError, so can be raised by any step (eg. socket connect)
+        if time.monotonic() < deadline:
+            raise
+
+        acc.error_msg = f"login timeout ({cfg.timeout} sec)"
+        raise asyncio.TimeoutError(acc.error_msg) from None
+
+
+async def _login(acc: Account, cfg: LoginConfig) -> Account:
+    # TOTP accounts get 2FA challenge instead of email code, so no need to connect upfront;
+    # if email code still requested, connection is opened lazily in login_confirm_email_code
+    imap = None
+    if cfg.email_first and not cfg.manual and not acc.mfa_code:
         imap = await imap_login(acc.email, acc.email_password)
 
     async with acc.make_client() as client:
@@ -274,6 +233,6 @@ async def login(acc: Account, cfg: LoginConfig | None = None) -> Account:
         client.headers["x-twitter-auth-type"] = "OAuth2Session"
 
         acc.active = True
-        acc.headers = {k: v for k, v in client.headers.items()}
-        acc.cookies = {k: v for k, v in client.cookies.items()}
+        acc.headers = dict(client.headers)
+        acc.cookies = dict(client.cookies)
         return acc
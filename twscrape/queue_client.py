@@ -1,6 +1,7 @@
 import asyncio
 import json
 import os
+import random
 from typing import Any
 from urllib.parse import parse_qsl, urlparse
 
@@ -17,6 +18,11 @@ TMP_TS = utc.now().isoformat().split(".")[0].replace("T", "_").replace(":", "-")
 SENSITIVE_PARAM_KEYS = {"password", "email", "email_password", "token", "auth", "authorization", "cookie"}
 
 
+def backoff(tries: int, base=0.5, cap=10.0) -> float:
+    # exponential backoff with full jitter, so parallel clients do not retry at same time
+    return random.uniform(0, min(cap, base * 2**tries))
+
+
 class HandledError(Exception): ...
 
 
@@ -41,7 +47,8 @@ class XClIdGenStore:
             except Exception as e:
                 last_exc = e
                 tries += 1
-                await asyncio.sleep(1)
+                if tries < 3:  # no wait before giving up
+                    await asyncio.sleep(backoff(tries))
 
         msg = "Failed to create XClIdGen. See: https://github.com/vladkens/twscrape/issues/248"
         raise AbortReqError(msg) from last_exc
@@ -70,8 +77,9 @@ class Ctx:
                 return rep
 
             tries += 1
-            logger.debug(f"Retrying request with new x-client-transaction-id: {url}")
-            await asyncio.sleep(1)
+            if tries < 3:
+                logger.debug(f"Retrying request with new x-client-transaction-id: {url}")
+                await asyncio.sleep(backoff(tries))
 
         raise AbortReqError(
             "Faield to get XClIdGen. See: https://github.com/vladkens/twscrape/issues/248"
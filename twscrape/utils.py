@@ -1,9 +1,13 @@
 import base64
+import functools
 import json
 import os
 from collections import defaultdict
 from datetime import datetime, timezone
-from typing import Any, AsyncGenerator, Callable, TypeVar
+from typing import TYPE_CHECKING, Any, AsyncGenerator, Callable, TypeVar
+
+if TYPE_CHECKING:
+    from fake_useragent import UserAgent
 
 T = TypeVar("T")
 
@@ -251,3 +255,12 @@ def get_env_bool(key: str, default_val: bool = False) -> bool:
     if val is None:
         return default_val
     return val.lower() in ("1", "true", "yes")
+
+
+@functools.cache
+def fake_ua() -> "UserAgent":
+    # fake_useragent is slow to import and parses its browsers db on every UserAgent(),
+    # so load it once and on first use only
+    from fake_useragent import UserAgent
+
+    return UserAgent()
@@ -5,14 +5,18 @@ import math
 import random
 import re
 import time
+from typing import TYPE_CHECKING
 
-import bs4
 import httpx
-from fake_useragent import UserAgent
+
+from .utils import fake_ua
+
+if TYPE_CHECKING:
+    import bs4
 
 
 def _make_client() -> httpx.AsyncClient:
-    headers = {"user-agent": UserAgent().chrome}
+    headers = {"user-agent": fake_ua().chrome}
     return httpx.AsyncClient(headers=headers, follow_redirects=True)
 
 
@@ -275,7 +279,9 @@ def cacl_anim_key(frames: list[float], target_time: float) -> str:
     return re.sub(r"[.-]", "", "".join(str_arr))
 
 
-def parse_vk_bytes(soup: bs4.BeautifulSoup) -> list[int]:
+def parse_vk_bytes(soup: "bs4.BeautifulSoup") -> list[int]:
+    import bs4
+
     el = soup.find("meta", {"name": "twitter-site-verification", "content": True})
     el = str(el.get("content")) if el and isinstance(el, bs4.Tag) else None
     if not el:
@@ -299,7 +305,7 @@ async def parse_anim_idx(text: str) -> list[int]:
     return items
 
 
-def parse_anim_arr(soup: bs4.BeautifulSoup, vk_bytes: list[int]) -> list[list[float]]:
+def parse_anim_arr(soup: "bs4.BeautifulSoup", vk_bytes: list[int]) -> list[list[float]]:
     # https://github.com/fa0311/twitter-tid-deobf/blob/c4fd61c36/output/a.js#L18
     els = list(soup.select("svg[id^='loading-x-anim'] g:first-child path:nth-child(2)"))
     els = [str(x.get("d") or "").strip() for x in els]
@@ -312,7 +318,7 @@ def parse_anim_arr(soup: bs4.BeautifulSoup, vk_bytes: list[int]) -> list[list[fl
     return arr
 
 
-async def load_keys(soup: bs4.BeautifulSoup) -> tuple[list[int], str]:
+async def load_keys(soup: "bs4.BeautifulSoup") -> tuple[list[int], str]:
     anim_idx = await parse_anim_idx(str(soup))
     vk_bytes = parse_vk_bytes(soup)
     anim_arr = parse_anim_arr(soup, vk_bytes)
@@ -332,6 +338,8 @@ async def load_keys(soup: bs4.BeautifulSoup) -> tuple[list[int], str]:
 class XClIdGen:
     @staticmethod
     async def create(clt: httpx.AsyncClient | None = None) -> "XClIdGen":
+        import bs4
+
         text = await get_tw_page_text("https://x.com/tesla", clt=clt)
         soup = bs4.BeautifulSoup(text, "html.parser")
 
@@ -362,6 +370,8 @@ class XClIdGen:
 
 
 async def main():
+    import bs4
+
     text = await get_tw_page_text("https://x.com/elonmusk")
     soup = bs4.BeautifulSoup(text, "html.parser")
 